@@ -1,107 +1,340 @@
 import io
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 import platform
+import re
+import threading
 import webbrowser
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from dataclasses import dataclass
+
+# Display check, done once at import
+HAS_DISPLAY = platform.system() != 'Linux' or "DISPLAY" in os.environ
+
 
 def is_display_available():
-    if platform.system() == 'Linux':
-        return "DISPLAY" in os.environ
-    return True
+    return HAS_DISPLAY
 
 # Constants
 epsilon_0 = 8.854e-12  # Permittivity of free space (F/m)
 q = 1.602e-19          # Electron charge (C)
 
+PARALLEL_PARSE_MIN_BYTES = 32 * 2**20  # Smaller inputs parse faster than a pool starts
+
+COMMA_TO_DOT = bytes.maketrans(b',', b'.')
+
+# Filename patterns, compiled once for all files
+FREQUENCY_RE = re.compile(r'(?<![\d.,])(\d+(?:[.,]\d+)?)kHz')
+SAMPLE_NAME_RE = re.compile(r'C\(V\)_0_([A-Za-z0-9]+)_')
+
+MAX_PLOT_POINTS = 2000  # Longer sweeps are thinned before plotting
+MAX_MARKER_POINTS = 100  # Denser sweeps are drawn as plain lines
+
+RESULT_COLUMNS = [
+    'Voltage(V)',
+    'Zcv_Forward (nm)',
+    'Zcv_Backward (nm)',
+    'Ncv_Forward (cm^-3)',
+    'Ncv_Backward (cm^-3)'
+]
+
+
+@dataclass
+class NcvZcvResult:
+    # (5, points) block in RESULT_COLUMNS row order; DataFrames only on export
+    block: np.ndarray
+    sheet_density_forward: float
+    sheet_density_backward: float
+
+    @property
+    def voltage(self):
+        return self.block[0]
+
+    @property
+    def zcv_forward_nm(self):
+        return self.block[1]
+
+    @property
+    def zcv_backward_nm(self):
+        return self.block[2]
+
+    @property
+    def ncv_forward_cm3(self):
+        return self.block[3]
+
+    @property
+    def ncv_backward_cm3(self):
+        return self.block[4]
+
+    def table(self):
+        # One row per voltage step, columns in RESULT_COLUMNS order
+        return self.block.T
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        return pd.DataFrame(self.table(), columns=RESULT_COLUMNS, copy=False)
+
 
 # Process .txt files and convert to .xlsx
 def process_txt_file(file_path):
-    filename = os.path.basename(file_path)
-    frequency = filename.split('kHz')[0] + 'kHz' if 'kHz' in filename else "Unknown"
+    # Imported lazily to keep start-up fast
+    import pandas as pd
 
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = file.read()
-    except UnicodeDecodeError:
-        with open(file_path, 'r', encoding='ISO-8859-1') as file:
-            data = file.read()
-        print(f"File '{filename}' decoded using ISO-8859-1 encoding.")
-    
-    data = data.replace(',', '.')
+    filename = os.path.basename(file_path)
+    match = FREQUENCY_RE.search(filename)
+    if match:
+        frequency = match.group(1) + 'kHz'
+    else:
+        frequency = filename.split('kHz')[0] + 'kHz' if 'kHz' in filename else "Unknown"
 
-    lines = data.split('\n')
-    filtered_lines = [line for line in lines if len(line.split()) >= 3]
+    # Comma decimals are swapped to dots on the raw bytes
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    if b',' in data:
+        data = data.translate(COMMA_TO_DOT)
 
-    if not filtered_lines:
-        print(f"Warning: File {filename} is empty after filtering. Skipping...")
+    # C parser; keeps three columns, short lines are NaN-padded
+    try:
+        df = pd.read_csv(
+            io.BytesIO(data),
+            sep=r'\s+',
+            header=None,
+            names=['Voltage(V)', 'C_Forward(F)', 'C_Backward(F)'],
+            usecols=[0, 1, 2],
+            engine='c',
+            # latin-1 decodes any byte, so non-UTF-8 headers still parse
+            encoding='latin-1',
+            low_memory=False,
+            on_bad_lines='skip'
+        )
+    except pd.errors.EmptyDataError:
+        df = None
+    except pd.errors.ParserError:
+        print(f"Error: File {filename} does not have enough valid columns.")
         return None, None, None
 
-    df = pd.read_csv(io.StringIO("\n".join(filtered_lines)), sep=r'\s+', header=None)
-    
-    if df.shape[1] < 3:
-        print(f"Error: File {filename} does not have enough valid columns.")
+    if df is not None and not all(dtype.kind == 'f' for dtype in df.dtypes):
+        # Header lines leave string columns; drop them and convert
+        try:
+            df = df.dropna().astype(np.float64)
+        except ValueError:
+            print(f"Error: File {filename} contains non-numeric data rows.")
+            return None, None, None
+
+    data = None
+    if df is not None:
+        # (points, 3) float64 array; drop NaN-padded rows
+        data = df.to_numpy(dtype=np.float64)
+        valid = np.isfinite(data).all(axis=1)
+        if not valid.all():
+            data = data[valid]
+
+    if data is None or len(data) == 0:
+        print(f"Warning: File {filename} is empty after filtering. Skipping...")
         return None, None, None
     
-    df = df.iloc[:, :3]  
-    df.columns = ['Voltage(V)', 'C_Forward(F)', 'C_Backward(F)']
-    
-    df = df.dropna()
-    
-    return df, frequency, filename
+    return data, frequency, filename
+
+
+def trapezoid(y, x):
+    # Trapezoidal rule along the last axis
+    return 0.5 * np.einsum('...i,...i->...', x[..., 1:] - x[..., :-1], y[..., 1:] + y[..., :-1])
+
+
+# Grow-only work arrays reused across _ncv_zcv_core calls
+scratch_buffers = {}
+
+
+def scratch_buffer(name, shape):
+    n = int(np.prod(shape))
+    buf = scratch_buffers.get(name)
+    if buf is None or len(buf) < n:
+        capacity = n if buf is None else max(n, 2 * len(buf))
+        buf = np.empty(capacity, dtype=np.float64)
+        scratch_buffers[name] = buf
+    return buf[:n].reshape(shape)
+
+
+def central_difference(a, out=None):
+    # np.gradient(a, axis=-1) for unit-spaced data
+    g = np.empty_like(a) if out is None else out
+    np.subtract(a[..., 2:], a[..., :-2], out=g[..., 1:-1])
+    g[..., 1:-1] *= 0.5
+    np.subtract(a[..., 1], a[..., 0], out=g[..., 0])
+    np.subtract(a[..., -1], a[..., -2], out=g[..., -1])
+    return g
+
+
+def _ncv_zcv_core(voltage, capacitance_forward, capacitance_backward, A, epsilon_r):
+    # Returned arrays are scratch-buffer views, overwritten by the next call
+    n = voltage.shape
+
+    # Prefactors with unit conversions folded in
+    ncv_scale = 1e-6 / (epsilon_0 * epsilon_r * A * A * q)
+    zcv_scale = 1e9 * epsilon_0 * epsilon_r * A
+
+    dV = central_difference(voltage, out=scratch_buffer('dV', n))
+    dC = scratch_buffer('dC', n)
+    C3 = scratch_buffer('C3', n)
+
+    # Flat steps (dC == 0) give dV/dC = 0
+    dV_dC_forward = scratch_buffer('Ncv_forward', n)
+    dV_dC_forward.fill(0.0)
+    central_difference(capacitance_forward, out=dC)
+    np.divide(dV, dC, out=dV_dC_forward, where=dC != 0)
+
+    dV_dC_backward = scratch_buffer('Ncv_backward', n)
+    dV_dC_backward.fill(0.0)
+    central_difference(capacitance_backward, out=dC)
+    np.divide(dV, dC, out=dV_dC_backward, where=dC != 0)
+
+    # Ncv (cm^-3) = |C^3 * ncv_scale * dV/dC|, in place
+    Ncv_forward_cm3 = dV_dC_forward
+    np.multiply(capacitance_forward, capacitance_forward, out=C3)
+    np.multiply(C3, capacitance_forward, out=C3)
+    np.multiply(Ncv_forward_cm3, C3, out=Ncv_forward_cm3)
+    np.multiply(Ncv_forward_cm3, ncv_scale, out=Ncv_forward_cm3)
+    np.abs(Ncv_forward_cm3, out=Ncv_forward_cm3)
+
+    Ncv_backward_cm3 = dV_dC_backward
+    np.multiply(capacitance_backward, capacitance_backward, out=C3)
+    np.multiply(C3, capacitance_backward, out=C3)
+    np.multiply(Ncv_backward_cm3, C3, out=Ncv_backward_cm3)
+    np.multiply(Ncv_backward_cm3, ncv_scale, out=Ncv_backward_cm3)
+    np.abs(Ncv_backward_cm3, out=Ncv_backward_cm3)
+
+    Zcv_forward_nm = np.divide(zcv_scale, capacitance_forward, out=scratch_buffer('Zcv_forward', n))
+    Zcv_backward_nm = np.divide(zcv_scale, capacitance_backward, out=scratch_buffer('Zcv_backward', n))
+
+    integrated_Ncv_forward = trapezoid(Ncv_forward_cm3, Zcv_forward_nm)
+    integrated_Ncv_backward = trapezoid(Ncv_backward_cm3, Zcv_backward_nm)
+
+    return (Zcv_forward_nm, Zcv_backward_nm, Ncv_forward_cm3, Ncv_backward_cm3,
+            integrated_Ncv_forward, integrated_Ncv_backward)
+
+
+def calculate_ncv_zcv_batch(sweeps, A, epsilon_r):
+    # Equal-length sweeps are stacked into one kernel call
+    results = [None] * len(sweeps)
+    groups = {}
+    for i, sweep in enumerate(sweeps):
+        groups.setdefault(len(sweep), []).append(i)
+
+    for n_points, indices in groups.items():
+        data = np.empty((3, len(indices), n_points), dtype=np.float64)
+        for row, i in enumerate(indices):
+            data[:, row, :] = sweeps[i].T
+        voltage, capacitance_forward, capacitance_backward = data
+
+        (Zcv_forward_nm, Zcv_backward_nm, Ncv_forward_cm3, Ncv_backward_cm3,
+         integrated_Ncv_forward, integrated_Ncv_backward) = _ncv_zcv_core(
+            voltage, capacitance_forward, capacitance_backward, A, epsilon_r
+        )
+
+        tables = np.empty((len(indices), 5, n_points), dtype=np.float64)
+        tables[:, 0] = voltage
+        tables[:, 1] = Zcv_forward_nm
+        tables[:, 2] = Zcv_backward_nm
+        tables[:, 3] = Ncv_forward_cm3
+        tables[:, 4] = Ncv_backward_cm3
+
+        for row, i in enumerate(indices):
+            results[i] = NcvZcvResult(
+                tables[row],
+                sheet_density_forward=float(integrated_Ncv_forward[row]),
+                sheet_density_backward=float(integrated_Ncv_backward[row])
+            )
 
+    return results
 
-def calculate_ncv_zcv(df, A, epsilon_r):
-    voltage = df['Voltage(V)']
-    capacitance_forward = df['C_Forward(F)']
-    capacitance_backward = df['C_Backward(F)']
 
-    dV_dC_forward = np.gradient(voltage) / np.gradient(capacitance_forward)
-    dV_dC_backward = np.gradient(voltage) / np.gradient(capacitance_backward)
+def calculate_ncv_zcv(sweep, A, epsilon_r):
+    return calculate_ncv_zcv_batch([sweep], A, epsilon_r)[0]
 
-    dV_dC_forward = np.nan_to_num(dV_dC_forward, nan=0.0, posinf=1e10, neginf=-1e10)
-    dV_dC_backward = np.nan_to_num(dV_dC_backward, nan=0.0, posinf=1e10, neginf=-1e10)
 
-    Ncv_forward = (capacitance_forward**3 / (epsilon_0 * epsilon_r * A**2 * q)) * dV_dC_forward
-    Ncv_backward = (capacitance_backward**3 / (epsilon_0 * epsilon_r * A**2 * q)) * dV_dC_backward
+def save_results_to_excel(output_file, results):
+    # One constant_memory workbook, one sheet per frequency
+    import xlsxwriter
 
-    Zcv_forward = (epsilon_0 * epsilon_r * A) / capacitance_forward
-    Zcv_backward = (epsilon_0 * epsilon_r * A) / capacitance_backward
+    options = {'constant_memory': True, 'use_zip64': False, 'nan_inf_to_errors': True}
+    with xlsxwriter.Workbook(output_file, options) as workbook:
+        for frequency, result in results.items():
+            worksheet = workbook.add_worksheet(frequency)
+            worksheet.write_row(0, 0, RESULT_COLUMNS)
+            for row, values in enumerate(result.table().tolist(), start=1):
+                worksheet.write_row(row, 0, values)
 
-    Ncv_forward_cm3 = np.abs(Ncv_forward * 1e-6)
-    Ncv_backward_cm3 = np.abs(Ncv_backward * 1e-6)
-    integrated_Ncv_forward = np.trapezoid(Ncv_forward_cm3, Zcv_forward * 1e9)
-    integrated_Ncv_backward = np.trapezoid(Ncv_backward_cm3, Zcv_backward * 1e9)
 
-    result_df = pd.DataFrame({
-        'Voltage(V)': voltage,
-        'Zcv_Forward (nm)': Zcv_forward * 1e9,
-        'Zcv_Backward (nm)': Zcv_backward * 1e9,
-        'Ncv_Forward (cm^-3)': Ncv_forward_cm3,
-        'Ncv_Backward (cm^-3)': Ncv_backward_cm3
-    })
-    
-    return result_df, integrated_Ncv_forward, integrated_Ncv_backward
+def save_results_to_parquet(output_file, results):
+    import pandas as pd
+
+    # A single table for all frequencies, indexed by (frequency, row)
+    data = pd.concat(
+        {frequency: result.to_dataframe() for frequency, result in results.items()},
+        names=['frequency', 'row']
+    )
+    data.to_parquet(output_file, engine='pyarrow', compression='zstd')
+
+
+def log_plot_points(x, y):
+    # Drop non-positive Ncv; thin long sweeps by per-bucket min/max
+    mask = y > 0
+    x, y = x[mask], y[mask]
+    n = len(y)
+    if n <= MAX_PLOT_POINTS:
+        return x, y
+
+    size = -(-n // (MAX_PLOT_POINTS // 2))
+    n_buckets = -(-n // size)
+    buckets = np.pad(y, (0, n_buckets * size - n), mode='edge').reshape(n_buckets, size)
+    offsets = np.arange(0, n_buckets * size, size)
+    keep = np.concatenate([[0, n - 1], offsets + buckets.argmin(axis=1), offsets + buckets.argmax(axis=1)])
+    keep = np.unique(np.minimum(keep, n - 1))
+    return x[keep], y[keep]
+
+
+def parse_files(file_paths):
+    # map keeps the input order; files that could not be parsed are left out
+    total_bytes = sum(os.path.getsize(path) for path in file_paths)
+    if len(file_paths) == 1 or total_bytes < PARALLEL_PARSE_MIN_BYTES:
+        parsed = [process_txt_file(path) for path in file_paths]
+    else:
+        # forkserver: don't fork the threaded GUI process
+        mp_context = get_context('forkserver') if os.name == 'posix' else None
+        max_workers = min(len(file_paths), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+            parsed = list(executor.map(process_txt_file, file_paths))
+    return [p for p in parsed if p[0] is not None]
+
+
+def sweep_marker(n_points, marker):
+    # Dense sweeps are drawn without markers
+    return marker if n_points <= MAX_MARKER_POINTS else 'None'
 
 
 def extract_sample_name(filename):
-    import re
-    match = re.search(r'C\(V\)_0_([A-Za-z0-9]+)_', filename)
+    match = SAMPLE_NAME_RE.search(filename)
     if match:
         return match.group(1)
     return "Unknown"
 
 def run_cli_mode():
     import argparse
+    import importlib.util
     print("Running in CLI mode. No GUI available.")
     parser = argparse.ArgumentParser(description="CLI Mode for Ncv and Zcv Calculation")
     parser.add_argument("--files", nargs='+', required=True, help="List of .txt files to process")
     parser.add_argument("--diameter", type=float, required=True, help="Capacitor diameter in µm")
     parser.add_argument("--epsilon", type=float, required=True, help="Relative permittivity (εr)")
     parser.add_argument("--interface", type=float, required=True, help="Expected interface depth (nm)")
+    parser.add_argument("--format", choices=['xlsx', 'parquet'], default='xlsx',
+                        help="Results file format; parquet is much faster to write and requires pyarrow")
 
     args = parser.parse_args()
+    if args.format == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        parser.error("--format parquet requires the pyarrow package")
 
     radius_m = (args.diameter * 1e-6) / 2
     A = np.pi * radius_m**2
@@ -112,15 +345,15 @@ def run_cli_mode():
     results = {}
     sample_names = set()
 
-    for file_path in args.files:
-        df, frequency, filename = process_txt_file(file_path)
-        if df is not None:
-            sample_name = extract_sample_name(filename)
-            sample_names.add(sample_name)
-            results_df, Ncv_f, Ncv_b = calculate_ncv_zcv(df, A, args.epsilon)
-            results[frequency] = (results_df, Ncv_f, Ncv_b)
-            print(f"{frequency}: Forward Sheet Carrier Density: {Ncv_f:.2e} cm^-2")
-            print(f"{frequency}: Backward Sheet Carrier Density: {Ncv_b:.2e} cm^-2")
+    parsed = parse_files(args.files)
+    for _, _, filename in parsed:
+        sample_names.add(extract_sample_name(filename))
+
+    batch = calculate_ncv_zcv_batch([sweep for sweep, _, _ in parsed], A, args.epsilon)
+    for (_, frequency, _), result in zip(parsed, batch):
+        results[frequency] = result
+        print(f"{frequency}: Forward Sheet Carrier Density: {result.sheet_density_forward:.2e} cm^-2")
+        print(f"{frequency}: Backward Sheet Carrier Density: {result.sheet_density_backward:.2e} cm^-2")
 
     if len(sample_names) > 1:
         print(f"Error: Multiple sample names detected: {sample_names}. Please ensure all files belong to the same sample.")
@@ -130,37 +363,43 @@ def run_cli_mode():
     output_folder = os.path.join(os.getcwd(), f"Results_{sample_name}")
     os.makedirs(output_folder, exist_ok=True)
 
-    # Save results to Excel
-    output_file = os.path.join(output_folder, f'Ncv_Zcv_Results_{sample_name}.xlsx')
-    with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
-        for frequency, (data, _, _) in results.items():
-            data.to_excel(writer, sheet_name=frequency, index=False)
+    # Save results
+    output_file = os.path.join(output_folder, f'Ncv_Zcv_Results_{sample_name}.{args.format}')
+    if args.format == 'parquet':
+        save_results_to_parquet(output_file, results)
+    else:
+        save_results_to_excel(output_file, results)
     print(f"Results saved to {output_file}")
 
-    # Plotting
-    fig, axes = plt.subplots(len(results), 2, figsize=(14, 12))
+    # Plotting on an Agg canvas
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
 
-    for i, (frequency, (data, Ncv_f, Ncv_b)) in enumerate(results.items()):
+    fig = Figure(figsize=(14, 12), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    axes = fig.subplots(len(results), 2, sharex='col', sharey='row', squeeze=False)
+
+    for i, (frequency, result) in enumerate(results.items()):
         ax_forward = axes[i, 0]
-        ax_forward.plot(data['Zcv_Forward (nm)'], data['Ncv_Forward (cm^-3)'], marker='o', color='red')
+        x, y = log_plot_points(result.zcv_forward_nm, result.ncv_forward_cm3)
+        ax_forward.plot(x, y, marker=sweep_marker(len(x), 'o'), color='red', rasterized=True)
         ax_forward.axvline(args.interface, color='orange', linestyle='--', label='Interface Depth')
         ax_forward.set_title(f'{frequency} - Forward')
         ax_forward.set_yscale('log')
         ax_forward.grid(True)
 
         ax_backward = axes[i, 1]
-        ax_backward.plot(data['Zcv_Backward (nm)'], data['Ncv_Backward (cm^-3)'], marker='x', color='black')
+        x, y = log_plot_points(result.zcv_backward_nm, result.ncv_backward_cm3)
+        ax_backward.plot(x, y, marker=sweep_marker(len(x), 'x'), color='black', rasterized=True)
         ax_backward.axvline(args.interface, color='orange', linestyle='--', label='Interface Depth')
         ax_backward.set_title(f'{frequency} - Backward')
         ax_backward.set_yscale('log')
         ax_backward.grid(True)
 
     plot_file = os.path.join(output_folder, f'Ncv_vs_Zcv_Plots_{sample_name}.png')
-    fig.savefig(plot_file)
+    canvas.print_png(plot_file)
     print(f"Plots saved to {plot_file}")
 
-    plt.close(fig)
-
 class NcvZcvApp:
     def __init__(self, root):
         self.root = root
@@ -169,6 +408,12 @@ class NcvZcvApp:
         self.file_paths = []
         self.results = {}
 
+        self.plot_window = None
+        self.fig = None
+        self.canvas = None
+        self.axes = None
+        self.lines = {}
+
         self.create_widgets()
 
     def create_widgets(self):
@@ -233,15 +478,39 @@ class NcvZcvApp:
         radius_m = (diameter_um * 1e-6) / 2
         A = np.pi * radius_m**2
 
+        self.process_button.config(state="disabled")
+        threading.Thread(
+            target=self.process_files,
+            args=(list(self.file_paths), A, epsilon_r, interface_z),
+            daemon=True
+        ).start()
+
+    def process_files(self, file_paths, A, epsilon_r, interface_z):
+        # Runs off the Tk thread; results are handed back through root.after
+        try:
+            parsed = parse_files(file_paths)
+            batch = calculate_ncv_zcv_batch([sweep for sweep, _, _ in parsed], A, epsilon_r)
+            outputs = [
+                (frequency, extract_sample_name(filename), result)
+                for (_, frequency, filename), result in zip(parsed, batch)
+            ]
+        except Exception as e:
+            self.root.after(0, self.processing_failed, str(e))
+            return
+        self.root.after(0, self.finish_processing, outputs, interface_z)
+
+    def processing_failed(self, message):
+        self.process_button.config(state="normal")
+        messagebox.showerror("Error", f"Processing failed: {message}")
+
+    def finish_processing(self, outputs, interface_z):
+        self.process_button.config(state="normal")
+
         self.results = {}
         sample_names = set()
-        for file_path in self.file_paths:
-            df, frequency, filename = process_txt_file(file_path)
-            if df is not None:
-                sample_name = extract_sample_name(filename)
-                sample_names.add(sample_name)
-                results_df, Ncv_f, Ncv_b = calculate_ncv_zcv(df, A, epsilon_r)
-                self.results[frequency] = (results_df, Ncv_f, Ncv_b)
+        for frequency, sample_name, result in outputs:
+            sample_names.add(sample_name)
+            self.results[frequency] = result
 
         if len(sample_names) > 1:
             messagebox.showerror("Error", f"Files belong to different samples: {sample_names}")
@@ -251,71 +520,96 @@ class NcvZcvApp:
         self.plot_results(interface_z, sample_name)
 
     def plot_results(self, interface_z, sample_name):
-        fig, axes = plt.subplots(len(self.results), 2, figsize=(14, 12))
-
-        if len(self.results) == 1:
-            axes = np.array([axes])
-
-        for i, (frequency, (data, Ncv_f, Ncv_b)) in enumerate(self.results.items()):
+        # Figure embedded in a Toplevel, no pyplot
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+        # Reuse the figure and axes while the number of frequencies is unchanged
+        n_rows = len(self.results)
+        window_open = self.plot_window is not None and self.plot_window.winfo_exists()
+        if self.axes is None or self.axes.shape[0] != n_rows:
+            self.fig = Figure(figsize=(14, 12), layout='constrained')
+            # Columns share Zcv, rows share Ncv
+            self.axes = self.fig.subplots(n_rows, 2, sharex='col', sharey='row', squeeze=False)
+            self.fig.supxlabel('Zcv (nm)')
+            self.fig.supylabel('Ncv (cm^-3)')
+            self.lines = {}
+            if window_open:
+                self.plot_window.destroy()
+                window_open = False
+        if not window_open:
+            self.plot_window = Toplevel(self.root)
+            self.canvas = FigureCanvasTkAgg(self.fig, master=self.plot_window)
+            NavigationToolbar2Tk(self.canvas, self.plot_window)
+            self.canvas.get_tk_widget().pack(fill='both', expand=True)
+
+        for i, (frequency, result) in enumerate(self.results.items()):
             # Forward Plot (Left Column)
-            ax_forward = axes[i, 0]
-            ax_forward.plot(
-                data['Zcv_Forward (nm)'],
-                data['Ncv_Forward (cm^-3)'],
-                marker='o',
-                color='red',
-                label=f'{frequency} Forward\nSheet Carrier Density = {Ncv_f:.2e} cm^-2'
+            self.plot_sweep(
+                i, 0,
+                result.zcv_forward_nm,
+                result.ncv_forward_cm3,
+                'red',
+                f'{frequency} Forward\nSheet Carrier Density = {result.sheet_density_forward:.2e} cm^-2',
+                f'Forward - {frequency}',
+                interface_z
             )
-            ax_forward.set_title(f'Forward - {frequency}', fontsize=10, loc='left')
-            ax_forward.axvline(interface_z, color='orange', linestyle='--', label='Interface Depth (Z)')
-            ax_forward.set_xlabel('Zcv (nm)')
-            ax_forward.set_ylabel('Ncv (cm^-3)')
-            ax_forward.set_yscale('log')
-            ax_forward.grid(True)
-            ax_forward.legend(loc='upper right')
 
             # Backward Plot (Right Column)
-            ax_backward = axes[i, 1]
-            ax_backward.plot(
-                data['Zcv_Backward (nm)'],
-                data['Ncv_Backward (cm^-3)'],
-                marker='o',
-                color='black',
-                label=f'{frequency} Backward\nSheet Carrier Density = {Ncv_b:.2e} cm^-2'
+            self.plot_sweep(
+                i, 1,
+                result.zcv_backward_nm,
+                result.ncv_backward_cm3,
+                'black',
+                f'{frequency} Backward\nSheet Carrier Density = {result.sheet_density_backward:.2e} cm^-2',
+                f'Backward - {frequency}',
+                interface_z
             )
-            ax_backward.set_title(f'Backward - {frequency}', fontsize=10, loc='left')
-            ax_backward.axvline(interface_z, color='orange', linestyle='--', label='Interface Depth (Z)')
-            ax_backward.set_xlabel('Zcv (nm)')
-            ax_backward.set_ylabel('Ncv (cm^-3)')
-            ax_backward.set_yscale('log')
-            ax_backward.grid(True)
-            ax_backward.legend(loc='upper right')
 
-        plt.tight_layout()
-        plt.show()
+        self.plot_window.title(f"Ncv vs Zcv - {sample_name}")
+        self.canvas.draw_idle()
 
         # Save plots and data
         output_folder = os.path.join(os.getcwd(), f"Results_{sample_name}")
         os.makedirs(output_folder, exist_ok=True)
 
         plot_file = os.path.join(output_folder, f'Ncv_vs_Zcv_Plots_{sample_name}.png')
-        fig.savefig(plot_file)
+        self.fig.savefig(plot_file)
         messagebox.showinfo("Success", f"Plots saved to {plot_file}")
 
         self.save_to_excel(output_folder, sample_name)
 
+    def plot_sweep(self, row, col, x, y, color, label, title, interface_z):
+        ax = self.axes[row, col]
+        x, y = log_plot_points(x, y)
+        if (row, col) in self.lines:
+            line, interface_line = self.lines[(row, col)]
+            line.set_data(x, y)
+            line.set_marker(sweep_marker(len(x), 'o'))
+            line.set_label(label)
+            interface_line.set_xdata([interface_z, interface_z])
+            ax.relim()
+            ax.autoscale_view()
+        else:
+            # Rasterized for lighter PDF/SVG exports
+            line, = ax.plot(x, y, marker=sweep_marker(len(x), 'o'), color=color, label=label, rasterized=True)
+            interface_line = ax.axvline(interface_z, color='orange', linestyle='--', label='Interface Depth (Z)')
+            ax.set_yscale('log')
+            ax.grid(True)
+            self.lines[(row, col)] = (line, interface_line)
+        ax.set_title(title, fontsize=10, loc='left')
+        ax.legend(loc='upper right')
+
     def save_to_excel(self, output_folder, sample_name):
         output_file = os.path.join(output_folder, f'Ncv_Zcv_Results_{sample_name}.xlsx')
-        with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
-            for frequency, (data, _, _) in self.results.items():
-                data.to_excel(writer, sheet_name=frequency, index=False)
+        save_results_to_excel(output_file, self.results)
 
         messagebox.showinfo("Success", f"Results saved to {output_file}")
 
 
 if __name__ == "__main__":
     if is_display_available():
-        from tkinter import Tk, filedialog, Label, Button, Entry, StringVar, messagebox, Frame
+        from tkinter import Tk, Toplevel, filedialog, Label, Button, Entry, StringVar, messagebox, Frame
         root = Tk()
         app = NcvZcvApp(root)
         root.mainloop()